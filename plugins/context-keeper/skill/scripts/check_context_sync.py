@@ -9,23 +9,30 @@ It only reads the git working tree status and the filesystem; it never writes fi
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
 import sys
 from pathlib import Path
 
 
-CODE_EXTENSIONS = {
+CODE_EXTENSIONS = frozenset({
     ".ts", ".tsx", ".js", ".jsx",
     ".py", ".go", ".rs",
     ".java", ".kt",
     ".c", ".cc", ".cpp", ".h", ".hpp",
     ".cs",
-}
+})
 
 
-def _run_git(args: list[str], cwd: Path) -> str | None:
+def _run_git(args: list[str], cwd: Path) -> bytes | None:
+    # Raw bytes: paths are decoded by the callers, independent of the locale.
+    # No stdin and no stderr so git can never block on a prompt.
     try:
-        return subprocess.check_output(["git", "-C", str(cwd), *args], text=True).strip()
+        return subprocess.check_output(
+            ["git", "-C", str(cwd), *args],
+            stdin=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
     except (subprocess.CalledProcessError, FileNotFoundError):
         return None
 
@@ -34,26 +41,26 @@ def _get_repo_root(project_path: Path) -> Path | None:
     output = _run_git(["rev-parse", "--show-toplevel"], project_path)
     if not output:
         return None
-    return Path(output)
+    return Path(os.fsdecode(output.rstrip(b"\n")))
 
 
-def _parse_status_lines(status_lines: list[str]) -> list[tuple[str, str]]:
+def _parse_status(raw: bytes) -> list[tuple[str, str]]:
+    """Parse `git status --porcelain=v1 -z --no-renames` output.
+
+    Each NUL-terminated record is "XY <path>" with the path unquoted; with
+    --no-renames a rename shows up as a D + A pair, so there is never a
+    second path to skip.
+    """
     entries: list[tuple[str, str]] = []
-    for line in status_lines:
-        if not line:
+    for record in raw.split(b"\0"):
+        if not record:
             continue
-        status = line[:2]
-        path_part = line[3:]
-        if " -> " in path_part:
-            path_part = path_part.split(" -> ", 1)[1]
+        status = record[:2].decode("ascii", "replace")
+        path_part = record[3:].decode("utf-8", "surrogateescape")
         entries.append((status, path_part))
     return entries
 
 
-def _is_code_file(path: Path) -> bool:
-    return path.suffix in CODE_EXTENSIONS
-
-
 def _has_status(status: str, codes: set[str]) -> bool:
     return any(code in status for code in codes)
 
@@ -64,13 +71,14 @@ def check_context_sync(project_path: Path) -> int:
         print("context-keeper: not a git repository; skip check.")
         return 0
 
-    status_output = _run_git(["status", "--porcelain"], repo_root)
+    status_output = _run_git(
+        ["status", "--porcelain=v1", "-z", "--no-renames"], repo_root
+    )
     if status_output is None:
         print("context-keeper: unable to read git status; skip check.")
         return 0
 
-    status_lines = status_output.splitlines()
-    entries = _parse_status_lines(status_lines)
+    entries = _parse_status(status_output)
     if not entries:
         print("context-keeper: no working tree changes detected.")
         return 0
@@ -86,17 +94,20 @@ def check_context_sync(project_path: Path) -> int:
         if _has_status(status, {"A", "D", "R", "?"}):
             structure_changed = True
 
-    tech_info_dirs_missing: set[str] = set()
-    for rel_path in changed_paths:
-        if rel_path.name in {"TECH_INFO.md", "USERAGENTS.md"}:
-            continue
-        if not _is_code_file(rel_path):
-            continue
-        dir_path = rel_path.parent
-        tech_info_path = dir_path / "TECH_INFO.md"
-        if (repo_root / tech_info_path).exists():
-            if tech_info_path.as_posix() not in changed_paths_set:
-                tech_info_dirs_missing.add(dir_path.as_posix() or ".")
+    # Collapse changed code files to their directories first, so each
+    # TECH_INFO.md is checked (and stat'ed) once however many files changed
+    code_dirs = {
+        rel_path.parent
+        for rel_path in changed_paths
+        if rel_path.name not in {"TECH_INFO.md", "USERAGENTS.md"}
+        and rel_path.suffix in CODE_EXTENSIONS
+    }
+    tech_info_dirs_missing: set[str] = {
+        dir_path.as_posix() or "."
+        for dir_path in code_dirs
+        if (dir_path / "TECH_INFO.md").as_posix() not in changed_paths_set
+        and (repo_root / dir_path / "TECH_INFO.md").exists()
+    }
 
     useragents_missing = structure_changed and "USERAGENTS.md" not in changed_paths_set
 
@@ -17,97 +17,112 @@ Usage:
 """
 
 import argparse
+import io
 import json
 import os
+import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TextIO
+
+try:
+    import orjson
+except ImportError:  # optional: faster package.json parsing
+    orjson = None
+
+try:
+    import pathspec
+except ImportError:  # optional: enables full .gitignore pattern support
+    pathspec = None
+
+# Both parsers accept bytes, which skips a separate decode pass
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # ============================================================================
 # Tech Stack Detection
 # ============================================================================
 
-TECH_STACK_DETECTORS = {
-    "typescript": {
-        "files": ["package.json", "tsconfig.json"],
-        "check": lambda p: (p / "tsconfig.json").exists() or _has_ts_dep(p),
-    },
-    "javascript": {
-        "files": ["package.json"],
-        "check": lambda p: (p / "package.json").exists()
-        and not (p / "tsconfig.json").exists(),
-    },
-    "react": {
-        "files": ["package.json"],
-        "check": lambda p: _has_dep(p, "react"),
-    },
-    "vue": {
-        "files": ["package.json"],
-        "check": lambda p: _has_dep(p, "vue"),
-    },
-    "astro": {
-        "files": ["package.json", "astro.config.mjs"],
-        "check": lambda p: _has_dep(p, "astro"),
-    },
-    "nextjs": {
-        "files": ["package.json", "next.config.js", "next.config.mjs"],
-        "check": lambda p: _has_dep(p, "next"),
-    },
-    "go": {
-        "files": ["go.mod"],
-        "check": lambda p: (p / "go.mod").exists(),
-    },
-    "python": {
-        "files": ["pyproject.toml", "requirements.txt", "setup.py"],
-        "check": lambda p: any(
-            (p / f).exists() for f in ["pyproject.toml", "requirements.txt", "setup.py"]
-        ),
-    },
-    "rust": {
-        "files": ["Cargo.toml"],
-        "check": lambda p: (p / "Cargo.toml").exists(),
-    },
-    "java": {
-        "files": ["pom.xml", "build.gradle"],
-        "check": lambda p: (p / "pom.xml").exists() or (p / "build.gradle").exists(),
-    },
+# JS framework stacks, detected from package.json dependencies
+JS_FRAMEWORK_DEPS = {
+    "react": "react",
+    "vue": "vue",
+    "astro": "astro",
+    "nextjs": "next",
+}
+
+# Other stacks, detected by marker files in the project root
+MARKER_FILES = {
+    "go": ("go.mod",),
+    "python": ("pyproject.toml", "requirements.txt", "setup.py"),
+    "rust": ("Cargo.toml",),
+    "java": ("pom.xml", "build.gradle"),
 }
 
 
+@lru_cache(maxsize=None)
 def _read_package_json(project_path: Path) -> dict:
-    """Read package.json if exists."""
+    """Read package.json if exists (parsed once per project path)."""
     pkg_path = project_path / "package.json"
-    if pkg_path.exists():
-        try:
-            return json.loads(pkg_path.read_text())
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-
-def _has_dep(project_path: Path, dep_name: str) -> bool:
-    """Check if a dependency exists in package.json."""
-    pkg = _read_package_json(project_path)
-    deps = pkg.get("dependencies", {})
-    dev_deps = pkg.get("devDependencies", {})
-    return dep_name in deps or dep_name in dev_deps
+    try:
+        # Open directly instead of exists() + read: one fewer stat()
+        data = pkg_path.read_bytes()
+    except OSError:
+        return {}
+    try:
+        pkg = _json_loads(data)
+    except ValueError:
+        # json.JSONDecodeError and orjson.JSONDecodeError both subclass it
+        return {}
+    return pkg if isinstance(pkg, dict) else {}
 
 
-def _has_ts_dep(project_path: Path) -> bool:
-    """Check if TypeScript is a dependency."""
-    return _has_dep(project_path, "typescript")
+def list_top_level_names(project_path: Path) -> frozenset[str]:
+    """Return entry names in the project root from a single directory read."""
+    try:
+        with os.scandir(project_path) as it:
+            return frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
 
 
-def detect_tech_stack(project_path: Path) -> list[str]:
+def detect_tech_stack(
+    project_path: Path, top_names: Optional[frozenset[str]] = None
+) -> list[str]:
     """Detect all tech stacks used in the project."""
     detected = []
-    for tech, config in TECH_STACK_DETECTORS.items():
-        try:
-            if config["check"](project_path):
-                detected.append(tech)
-        except Exception:
-            pass
+
+    # Marker files are looked up in one listing of the root instead of one
+    # stat() per candidate file
+    if top_names is None:
+        top_names = list_top_level_names(project_path)
+
+    # Read package.json once and check every JS dependency against it
+    has_package_json = "package.json" in top_names
+    pkg = _read_package_json(project_path) if has_package_json else {}
+    deps = frozenset().union(
+        *(
+            section
+            for section in (pkg.get("dependencies"), pkg.get("devDependencies"))
+            if isinstance(section, dict)
+        )
+    )
+    has_tsconfig = "tsconfig.json" in top_names
+
+    if has_tsconfig or "typescript" in deps:
+        detected.append("typescript")
+    if has_package_json and not has_tsconfig:
+        detected.append("javascript")
+    for tech, dep_name in JS_FRAMEWORK_DEPS.items():
+        if dep_name in deps:
+            detected.append(tech)
+
+    for tech, marker_files in MARKER_FILES.items():
+        if any(f in top_names for f in marker_files):
+            detected.append(tech)
+
     return detected
 
 
@@ -190,8 +205,9 @@ def get_coding_conventions(tech_stacks: list[str]) -> list[str]:
 # Directory Structure Analysis
 # ============================================================================
 
-# Default directories to always ignore
-DEFAULT_IGNORE_DIRS = {
+# Default directories to always ignore (frozen: it is shared by every scan
+# and unioned into the cached per-project sets)
+DEFAULT_IGNORE_DIRS = frozenset({
     # Version control
     ".git",
     ".svn",
@@ -201,147 +217,272 @@ DEFAULT_IGNORE_DIRS = {
     ".cursor",
     # Context-keeper internal
     ".context-keeper",
-}
+})
 
 
-def parse_gitignore(project_path: Path) -> set[str]:
-    """Parse .gitignore and extract directory patterns to ignore."""
-    gitignore_path = project_path / ".gitignore"
+def _gitignore_mtime(project_path: Path) -> Optional[int]:
+    """Return the .gitignore mtime (ns), or None when there is none.
+
+    Used as part of the cache key so an edited .gitignore is re-read.
+    """
+    try:
+        return os.stat(project_path / ".gitignore").st_mtime_ns
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=128)
+def _parse_gitignore_cached(path_str: str, mtime: Optional[int]) -> frozenset[str]:
     ignore_dirs = set()
 
-    if not gitignore_path.exists():
-        return ignore_dirs
+    if mtime is None:
+        return frozenset()
 
     try:
-        content = gitignore_path.read_text()
-        for line in content.splitlines():
-            line = line.strip()
+        # Parse in bytes and decode only the names that survive the filters
+        with open(os.path.join(path_str, ".gitignore"), "rb") as f:
+            data = f.read()
+        for raw in data.split(b"\n"):
+            line = raw.strip()
             # Skip comments and empty lines
-            if not line or line.startswith("#"):
+            if not line or line.startswith(b"#"):
                 continue
             # Skip negation patterns
-            if line.startswith("!"):
+            if line.startswith(b"!"):
                 continue
             # Handle directory patterns (ending with / or just directory names)
-            if line.endswith("/"):
-                ignore_dirs.add(line.rstrip("/"))
+            if line.endswith(b"/"):
+                name = line.rstrip(b"/")
             else:
                 # Also treat non-path patterns as potential directory names
                 # Only if they don't contain wildcards or path separators
-                if "*" not in line and "?" not in line:
-                    # Remove leading slash if present
-                    clean_line = line.lstrip("/")
-                    if "/" not in clean_line:
-                        ignore_dirs.add(clean_line)
-    except Exception:
+                if b"*" in line or b"?" in line:
+                    continue
+                # Remove leading slash if present
+                name = line.lstrip(b"/")
+                if b"/" in name:
+                    continue
+            ignore_dirs.add(name.decode("utf-8", "replace"))
+    except OSError:
         pass
 
-    return ignore_dirs
+    return frozenset(ignore_dirs)
+
+
+def parse_gitignore(project_path: Path) -> frozenset[str]:
+    """Parse .gitignore and extract directory patterns to ignore.
+
+    Results are cached per (project path, .gitignore mtime).
+    """
+    return _parse_gitignore_cached(str(project_path), _gitignore_mtime(project_path))
+
+
+@lru_cache(maxsize=128)
+def _get_ignore_dirs_cached(path_str: str, mtime: Optional[int]) -> frozenset[str]:
+    # Start with default ignores, then add patterns from .gitignore
+    return DEFAULT_IGNORE_DIRS | _parse_gitignore_cached(path_str, mtime)
 
 
-def get_ignore_dirs(project_path: Path) -> set[str]:
+def get_ignore_dirs(project_path: Path) -> frozenset[str]:
     """Get combined set of directories to ignore."""
-    # Start with default ignores
-    ignore_dirs = DEFAULT_IGNORE_DIRS.copy()
+    return _get_ignore_dirs_cached(str(project_path), _gitignore_mtime(project_path))
 
-    # Add patterns from .gitignore
-    gitignore_patterns = parse_gitignore(project_path)
-    ignore_dirs.update(gitignore_patterns)
 
-    return ignore_dirs
+@lru_cache(maxsize=128)
+def _load_gitignore_spec_cached(
+    path_str: str, mtime: Optional[int]
+) -> Optional["pathspec.PathSpec"]:
+    if pathspec is None or mtime is None:
+        return None
 
+    try:
+        with open(os.path.join(path_str, ".gitignore"), encoding="utf-8") as f:
+            return pathspec.GitIgnoreSpec.from_lines(f)
+    except Exception:
+        return None
+
+
+def load_gitignore_spec(project_path: Path) -> Optional["pathspec.PathSpec"]:
+    """Compile .gitignore into a PathSpec (requires the optional pathspec package).
+
+    Compiled specs are cached per (project path, .gitignore mtime).
+    """
+    if pathspec is None:
+        return None
+    return _load_gitignore_spec_cached(
+        str(project_path), _gitignore_mtime(project_path)
+    )
 
-def analyze_directory_structure(project_path: Path) -> dict:
-    """Analyze project directory structure."""
-    structure = {}
-
-    # Get ignore patterns from .gitignore
-    ignore_dirs = get_ignore_dirs(project_path)
-
-    def scan_dir(path: Path) -> Optional[dict]:
-        if path.name in ignore_dirs:
-            return None
-        if not path.is_dir():
-            return None
-
-        result = {
-            "name": path.name,
-            "path": str(path.relative_to(project_path)),
-            "files": [],
-            "subdirs": [],
-        }
-
-        try:
-            for item in sorted(path.iterdir()):
-                if item.is_file() and not item.name.startswith("."):
-                    result["files"].append(item.name)
-                elif item.is_dir() and item.name not in ignore_dirs:
-                    subdir = scan_dir(item)
-                    if subdir:
-                        result["subdirs"].append(subdir)
-        except PermissionError:
-            pass
-
-        return result
-
-    return scan_dir(project_path)
-
-
-def infer_directory_purpose(dir_name: str, files: list[str]) -> str:
-    """Infer the purpose of a directory based on its name and contents."""
-    name_lower = dir_name.lower()
 
-    purpose_map = {
-        "src": "Source code root",
-        "lib": "Library files and utility functions",
-        "utils": "Utility functions",
-        "helpers": "Helper functions",
-        "components": "UI components",
-        "pages": "Page components/routes",
-        "app": "Application core logic",
-        "api": "API interface definitions",
-        "services": "Business service layer",
-        "hooks": "React Hooks",
-        "stores": "State management",
-        "store": "State management",
-        "types": "Type definitions",
-        "interfaces": "Interface definitions",
-        "models": "Data models",
-        "schemas": "Data validation schemas",
-        "config": "Configuration files",
-        "constants": "Constant definitions",
-        "assets": "Static assets",
-        "public": "Public static files",
-        "static": "Static files",
-        "styles": "Style files",
-        "css": "CSS stylesheets",
-        "tests": "Test files",
-        "test": "Test files",
-        "__tests__": "Test files",
-        "spec": "Test specifications",
-        "scripts": "Script files",
-        "bin": "Executable files",
-        "docs": "Documentation",
-        "migrations": "Database migrations",
-        "middleware": "Middleware",
-        "plugins": "Plugins",
-        "layouts": "Layout components",
-        "templates": "Template files",
-        "features": "Feature modules",
-        "modules": "Business modules",
-        "domain": "Domain models",
-        "infrastructure": "Infrastructure layer",
-        "adapters": "Adapter layer",
-        "ports": "Port definitions",
+def _new_node(name: str, rel_path: str) -> dict:
+    return {
+        "name": name,
+        "path": rel_path,
+        # Inferred once here; the renderers read it instead of re-inferring
+        "purpose": infer_directory_purpose(name),
+        "files": [],
+        "subdirs": [],
     }
 
-    for key, purpose in purpose_map.items():
-        if name_lower == key or name_lower.endswith(key):
-            return purpose
+
+def analyze_directory_structure(project_path: Path) -> dict:
+    """Analyze project directory structure.
+
+    Each node's "files" and "subdirs" are sorted by name; downstream
+    generators rely on that order and do not sort again.
+    """
+    # Get ignore patterns from .gitignore. With pathspec installed the full
+    # gitignore syntax is honored; otherwise only plain directory names are.
+    spec = load_gitignore_spec(project_path)
+    if spec is not None:
+        ignore_dirs = DEFAULT_IGNORE_DIRS
+    else:
+        ignore_dirs = get_ignore_dirs(project_path)
+
+    root = _new_node(project_path.name, ".")
+    root_str = str(project_path)
+    nodes = {root_str: root}
+
+    # topdown=True lets us prune dirnames in place so ignored trees are never
+    # entered; sorting it also fixes the visit order, so each child is
+    # appended to its parent's "subdirs" already in name order
+    def node_for(dirpath: str) -> dict:
+        node = nodes.get(dirpath)
+        if node is None:
+            # Parent was visited first (topdown), so it is always present
+            parent = nodes[os.path.dirname(dirpath)]
+            name = os.path.basename(dirpath)
+            rel_path = name if parent is root else f"{parent['path']}/{name}"
+            node = _new_node(name, rel_path)
+            parent["subdirs"].append(node)
+            nodes[dirpath] = node
+        return node
+
+    def on_error(err: OSError) -> None:
+        # os.walk never yields a directory it cannot list; keep an unreadable
+        # one in its parent's "subdirs" with empty contents instead
+        if isinstance(err, PermissionError) and err.filename != root_str:
+            node_for(err.filename)
+
+    # os.walk is scandir-based: the d_type from each listing classifies
+    # entries without a per-entry stat(), and followlinks=False keeps
+    # symlinked directories from being entered
+    for dirpath, dirnames, filenames in os.walk(
+        root_str, topdown=True, onerror=on_error, followlinks=False
+    ):
+        node = node_for(dirpath)
+        rel_path = node["path"]
+        kept = []
+        for d in dirnames:
+            if d in ignore_dirs:
+                continue
+            if spec is not None:
+                child_rel = d if rel_path == "." else f"{rel_path}/{d}"
+                # Trailing slash so directory-only patterns (e.g. "build/") match
+                if spec.match_file(child_rel + "/"):
+                    continue
+            kept.append(d)
+        kept.sort()
+        dirnames[:] = kept
+
+        node["files"] = sorted(
+            f for f in filenames if f not in ignore_dirs and not f.startswith(".")
+        )
+
+    return root
+
+
+# Directory name -> purpose, matched exactly or as a name suffix
+DIRECTORY_PURPOSES = {
+    "src": "Source code root",
+    "lib": "Library files and utility functions",
+    "utils": "Utility functions",
+    "helpers": "Helper functions",
+    "components": "UI components",
+    "pages": "Page components/routes",
+    "app": "Application core logic",
+    "api": "API interface definitions",
+    "services": "Business service layer",
+    "hooks": "React Hooks",
+    "stores": "State management",
+    "store": "State management",
+    "types": "Type definitions",
+    "interfaces": "Interface definitions",
+    "models": "Data models",
+    "schemas": "Data validation schemas",
+    "config": "Configuration files",
+    "constants": "Constant definitions",
+    "assets": "Static assets",
+    "public": "Public static files",
+    "static": "Static files",
+    "styles": "Style files",
+    "css": "CSS stylesheets",
+    "tests": "Test files",
+    "test": "Test files",
+    "__tests__": "Test files",
+    "spec": "Test specifications",
+    "scripts": "Script files",
+    "bin": "Executable files",
+    "docs": "Documentation",
+    "migrations": "Database migrations",
+    "middleware": "Middleware",
+    "plugins": "Plugins",
+    "layouts": "Layout components",
+    "templates": "Template files",
+    "features": "Feature modules",
+    "modules": "Business modules",
+    "domain": "Domain models",
+    "infrastructure": "Infrastructure layer",
+    "adapters": "Adapter layer",
+    "ports": "Port definitions",
+}
+
+# Trie over the reversed DIRECTORY_PURPOSES keys; walking a reversed name
+# through it finds the longest matching suffix in O(len(name))
+_TRIE_END = ""
+
+
+def _build_suffix_trie(mapping: dict[str, str]) -> dict:
+    trie: dict = {}
+    for key, purpose in mapping.items():
+        node = trie
+        for ch in reversed(key):
+            node = node.setdefault(ch, {})
+        node[_TRIE_END] = purpose
+    return trie
+
+
+_PURPOSE_SUFFIX_TRIE = _build_suffix_trie(DIRECTORY_PURPOSES)
+
+
+def _match_purpose_suffix(name_lower: str) -> Optional[str]:
+    """Return the purpose of the longest DIRECTORY_PURPOSES key ending name_lower."""
+    node = _PURPOSE_SUFFIX_TRIE
+    match = None
+    for ch in reversed(name_lower):
+        node = node.get(ch)
+        if node is None:
+            break
+        match = node.get(_TRIE_END, match)
+    return match
+
+
+@lru_cache(maxsize=None)
+def infer_directory_purpose(dir_name: str) -> str:
+    """Infer the purpose of a directory based on its name."""
+    name_lower = dir_name.lower()
+
+    # Tier 1: Known directory names (exact match first, then suffix)
+    purpose = DIRECTORY_PURPOSES.get(name_lower)
+    if purpose is not None:
+        return purpose
+    purpose = _match_purpose_suffix(name_lower)
+    if purpose is not None:
+        return purpose
 
     # Tier 2: Path semantics (e.g., payment-gateway -> Payment Gateway)
-    readable = name.replace("-", " ").replace("_", " ").title()
-    if readable != name:
+    readable = dir_name.replace("-", " ").replace("_", " ").title()
+    if readable != dir_name:
         return f"{readable} module"
 
     # Tier 3: AI fallback
@@ -352,19 +493,33 @@ def infer_directory_purpose(dir_name: str, files: list[str]) -> str:
 # File Generation
 # ============================================================================
 
+# Formats for the generated-at stamp in USERAGENTS.md and the
+# last-updated date in TECH_INFO.md
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+DATE_FORMAT = "%Y-%m-%d"
 
-def generate_useragents_md(
+# File extensions listed in the TECH_INFO.md file inventory
+CODE_EXTENSIONS = frozenset({".ts", ".tsx", ".js", ".jsx", ".py", ".go", ".rs"})
+
+
+def write_useragents_md(
+    out: TextIO,
     project_path: Path,
     tech_stacks: list[str],
     conventions: list[str],
     structure: dict,
-) -> str:
-    """Generate USERAGENTS.md content."""
+    timestamp: Optional[str] = None,
+) -> None:
+    """Write USERAGENTS.md content to `out` section by section.
+
+    `timestamp` defaults to the current time; main() passes one shared value.
+    """
+    if timestamp is None:
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
 
     project_name = project_path.name
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    content = f"""# {project_name} - Project Context Guide
+    out.write(f"""# {project_name} - Project Context Guide
 
 > **Generated at**: {timestamp}
 > **Tech stack**: {", ".join(tech_stacks) if tech_stacks else "Not detected"}
@@ -383,33 +538,35 @@ def generate_useragents_md(
 
 ## 📁 Project Directory Structure
 
-"""
+""")
 
-    def render_structure(node: dict, indent: int = 0) -> str:
-        lines = []
-        prefix = "  " * indent
-        purpose = infer_directory_purpose(node["name"], node["files"])
+    # Bound once so the recursive helpers below use a fast local lookup
+    write = out.write
+
+    def render_structure(node: dict, indent: int = 0) -> None:
+        name = node["name"]
 
         if indent == 0:
-            lines.append(f"```")
-            lines.append(f"{node['name']}/")
+            write(f"```\n{name}/\n")
         else:
-            lines.append(f"{prefix}├── {node['name']}/  # {purpose}")
-            lines.append(f"{prefix}│   └── TECH_INFO.md  # 📄 目录技术文档")
+            prefix = "  " * indent
+            write(
+                f"{prefix}├── {name}/  # {node['purpose']}\n"
+                f"{prefix}│   └── TECH_INFO.md  # 📄 目录技术文档\n"
+            )
 
-        for subdir in node.get("subdirs", []):
-            lines.append(render_structure(subdir, indent + 1))
+        child_indent = indent + 1
+        for subdir in node.get("subdirs", ()):
+            render_structure(subdir, child_indent)
 
         if indent == 0:
-            lines.append(f"└── USERAGENTS.md  # 📌 This guide file")
-            lines.append(f"```")
-
-        return "\n".join(lines)
+            # No newline after the closing fence; the next section starts with one
+            write("└── USERAGENTS.md  # 📌 This guide file\n```")
 
     if structure:
-        content += render_structure(structure)
+        render_structure(structure)
 
-    content += f"""
+    out.write("""
 
 ---
 
@@ -417,12 +574,11 @@ def generate_useragents_md(
 
 The following conventions must be strictly followed:
 
-"""
+""")
 
-    for i, conv in enumerate(conventions, 1):
-        content += f"{i}. {conv}\n"
+    out.write("".join(f"{i}. {conv}\n" for i, conv in enumerate(conventions, 1)))
 
-    content += """
+    out.write("""
 
 ---
 
@@ -474,35 +630,54 @@ In the following situations, you **must** update relevant documentation:
 
 ## 🔗 Directory Documentation Index
 
-"""
+""")
 
-    def list_tech_info_links(node: dict, base_path: str = "") -> list[str]:
-        links = []
-        current_path = f"{base_path}/{node['name']}" if base_path else node["name"]
+    def list_tech_info_links(node: dict, base_path: str = "") -> None:
+        name = node["name"]
+        current_path = f"{base_path}/{name}" if base_path else name
 
         if base_path:  # Skip root
-            purpose = infer_directory_purpose(node["name"], node["files"])
-            links.append(f"- [{node['name']}]({current_path}/TECH_INFO.md) - {purpose}")
-
-        for subdir in node.get("subdirs", []):
-            links.extend(list_tech_info_links(subdir, current_path))
+            write(f"- [{name}]({current_path}/TECH_INFO.md) - {node['purpose']}\n")
 
-        return links
+        for subdir in node.get("subdirs", ()):
+            list_tech_info_links(subdir, current_path)
 
     if structure:
-        for link in list_tech_info_links(structure):
-            content += link + "\n"
+        list_tech_info_links(structure)
+
+
+def generate_useragents_md(
+    project_path: Path,
+    tech_stacks: list[str],
+    conventions: list[str],
+    structure: dict,
+    timestamp: Optional[str] = None,
+) -> str:
+    """Generate USERAGENTS.md content as a string (see write_useragents_md)."""
+    buf = io.StringIO()
+    write_useragents_md(buf, project_path, tech_stacks, conventions, structure, timestamp)
+    return buf.getvalue()
 
-    return content
 
+def generate_tech_info_md(
+    dir_name: str,
+    files: list[str],
+    timestamp: Optional[str] = None,
+    purpose: Optional[str] = None,
+) -> str:
+    """Generate TECH_INFO.md template for a directory.
 
-def generate_tech_info_md(dir_name: str, files: list[str]) -> str:
-    """Generate TECH_INFO.md template for a directory."""
+    `files` is expected in sorted order, as analyze_directory_structure
+    produces it. `timestamp` defaults to today's date.
+    """
+    if timestamp is None:
+        timestamp = datetime.now().strftime(DATE_FORMAT)
 
-    purpose = infer_directory_purpose(dir_name, files)
-    timestamp = datetime.now().strftime("%Y-%m-%d")
+    if purpose is None:
+        purpose = infer_directory_purpose(dir_name)
 
-    content = f"""# {dir_name} - Technical Documentation
+    parts: list[str] = [
+        f"""# {dir_name} - Technical Documentation
 
 > **Directory purpose**: {purpose}
 > **Last updated**: {timestamp}
@@ -514,17 +689,17 @@ def generate_tech_info_md(dir_name: str, files: list[str]) -> str:
 | Filename | Description | Input | Output | Dependencies |
 |----------|-------------|-------|--------|--------------|
 """
+    ]
 
-    for file in sorted(files):
-        if file.endswith((".ts", ".tsx", ".js", ".jsx", ".py", ".go", ".rs")):
-            content += f"| `{file}` | [待补充] | [待补充] | [待补充] | [待补充] |\n"
+    rows = [
+        f"| `{file}` | [待补充] | [待补充] | [待补充] | [待补充] |\n"
+        for file in files
+        if os.path.splitext(file)[1] in CODE_EXTENSIONS
+    ]
+    parts.extend(rows or ["| (无代码文件) | - | - | - | - |\n"])
 
-    if not any(
-        f.endswith((".ts", ".tsx", ".js", ".jsx", ".py", ".go", ".rs")) for f in files
-    ):
-        content += "| (无代码文件) | - | - | - | - |\n"
-
-    content += """
+    parts.append(
+        f"""
 
 ---
 
@@ -539,9 +714,10 @@ def generate_tech_info_md(dir_name: str, files: list[str]) -> str:
 ## 📝 Notes
 
 [Add special notes, architectural decisions, or considerations for this directory]
-""".format(timestamp=timestamp)
+"""
+    )
 
-    return content
+    return "".join(parts)
 
 
 def generate_agents_patch(project_path: Path) -> str:
@@ -576,15 +752,30 @@ def generate_agents_patch(project_path: Path) -> str:
 # ============================================================================
 
 
-def create_tech_info_files(project_path: Path, structure: dict, dry_run: bool = False):
+def create_tech_info_files(
+    project_path: Path,
+    structure: dict,
+    dry_run: bool = False,
+    parallel: bool = True,
+    timestamp: Optional[str] = None,
+):
     """
     Create TECH_INFO.md files for each directory.
 
+    Files are rendered first and then written in one batch; with `parallel`
+    the independent writes are overlapped on a thread pool. Pass
+    `parallel=False` to write sequentially (e.g. when debugging).
+
     NOTE: This function is deprecated. TECH_INFO.md files should be created
     on-demand by the AI agent when working in a directory, rather than
     pre-generating for all directories.
     """
 
+    # One timestamp for the whole run instead of one clock read per directory
+    if timestamp is None:
+        timestamp = datetime.now().strftime(DATE_FORMAT)
+    pending: list[tuple[Path, str]] = []
+
     def process_dir(node: dict, parent_path: Path):
         if node["path"] == ".":
             dir_path = parent_path
@@ -594,13 +785,14 @@ def create_tech_info_files(project_path: Path, structure: dict, dry_run: bool =
         # Skip root directory
         if node["path"] != ".":
             tech_info_path = dir_path / "TECH_INFO.md"
-            content = generate_tech_info_md(node["name"], node["files"])
+            content = generate_tech_info_md(
+                node["name"], node["files"], timestamp, node["purpose"]
+            )
 
             if dry_run:
                 print(f"[DRY-RUN] Would create: {tech_info_path}")
             else:
-                tech_info_path.write_text(content)
-                print(f"✅ Created: {tech_info_path}")
+                pending.append((tech_info_path, content))
 
         for subdir in node.get("subdirs", []):
             process_dir(subdir, parent_path)
@@ -608,24 +800,79 @@ def create_tech_info_files(project_path: Path, structure: dict, dry_run: bool =
     if structure:
         process_dir(structure, project_path)
 
+    def write(item: tuple[Path, str]) -> Path:
+        path, content = item
+        path.write_text(content)
+        return path
+
+    if parallel and len(pending) > 1:
+        # Writes are I/O-bound, so oversubscribe the CPUs; never more threads
+        # than files
+        workers = min(32, (os.cpu_count() or 1) * 4, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            written = list(executor.map(write, pending))
+    else:
+        written = [write(item) for item in pending]
+
+    for tech_info_path in written:
+        print(f"✅ Created: {tech_info_path}")
+
+
+# Headers that mark AGENTS.md/CLAUDE.md as already patched: the one written
+# by generate_agents_patch and the one used by earlier (Chinese) releases
+AGENTS_MARKERS = (
+    "## 🔒 MANDATORY: Context Maintenance (context-keeper)".encode("utf-8"),
+    "## 🔒 强制执行：上下文维护 (context-keeper)".encode("utf-8"),
+)
+
+
+def _has_marker(path: Path, markers: tuple[bytes, ...], head_size: int = 16384) -> bool:
+    """Return True if any marker occurs in the file.
+
+    The patch is inserted near the top, so the head is checked first and the
+    rest of the file is only read on a miss.
+    """
+    with open(path, "rb") as f:
+        head = f.read(head_size)
+        if any(m in head for m in markers):
+            return True
+        rest = f.read()
+    if not rest:
+        return False
+    data = head + rest
+    return any(m in data for m in markers)
+
 
-def update_agents_file(project_path: Path, dry_run: bool = False) -> bool:
-    """Update AGENTS.md or CLAUDE.md with context-keeper instructions."""
+def update_agents_file(
+    project_path: Path,
+    dry_run: bool = False,
+    top_names: Optional[frozenset[str]] = None,
+) -> bool:
+    """Update AGENTS.md or CLAUDE.md with context-keeper instructions.
+
+    `top_names` is the project root listing (see list_top_level_names);
+    it is read here when not supplied.
+    """
 
     agents_files = ["AGENTS.md", "CLAUDE.md"]
     patch_content = generate_agents_patch(project_path)
-    marker = "## 🔒 强制执行：上下文维护 (context-keeper)"
 
+    if top_names is None:
+        top_names = list_top_level_names(project_path)
+
+    found = False
     for filename in agents_files:
         filepath = project_path / filename
-        if filepath.exists():
-            current_content = filepath.read_text()
+        if filename in top_names:
+            found = True
 
-            # Check if already patched
-            if marker in current_content:
+            # Check if already patched without decoding the whole file
+            if _has_marker(filepath, AGENTS_MARKERS):
                 print(f"ℹ️  {filename} already contains context-keeper instructions")
                 continue
 
+            current_content = filepath.read_text()
+
             # Add patch at the beginning after any frontmatter
             lines = current_content.split("\n")
             insert_idx = 0
@@ -652,6 +899,10 @@ def update_agents_file(project_path: Path, dry_run: bool = False) -> bool:
 
             return True
 
+    # Every existing file is already patched
+    if found:
+        return False
+
     # No existing file found, create AGENTS.md
     filepath = project_path / "AGENTS.md"
     content = f"# Agent Instructions\n\n{patch_content}"
@@ -679,20 +930,28 @@ def main():
     args = parser.parse_args()
     project_path = Path(args.project_path).resolve()
 
-    if not project_path.exists():
+    # One stat() answers both "exists" and "is a directory"
+    try:
+        st = os.stat(project_path)
+    except (FileNotFoundError, NotADirectoryError):
         print(f"❌ Error: Project path does not exist: {project_path}")
         sys.exit(1)
 
-    if not project_path.is_dir():
+    if not stat.S_ISDIR(st.st_mode):
         print(f"❌ Error: Project path is not a directory: {project_path}")
         sys.exit(1)
 
     print(f"🔍 Scanning project: {project_path}")
     print()
 
+    timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+
     # Step 1: Detect tech stack
     print("📊 Detecting tech stack...")
-    tech_stacks = detect_tech_stack(project_path)
+    # List the project root once; tech-stack detection and the agent-file
+    # update both answer their existence checks from it
+    top_names = list_top_level_names(project_path)
+    tech_stacks = detect_tech_stack(project_path, top_names)
     print(f"   Found: {', '.join(tech_stacks) if tech_stacks else 'None detected'}")
     print()
 
@@ -709,28 +968,30 @@ def main():
 
     # Step 4: Generate USERAGENTS.md
     print("📝 Generating USERAGENTS.md...")
-    useragents_content = generate_useragents_md(
-        project_path, tech_stacks, conventions, structure
-    )
     useragents_path = project_path / "USERAGENTS.md"
 
+    # Sections are written straight to the file as they are generated; a
+    # dry run has nothing to write, so it skips rendering entirely
     if args.dry_run:
         print(f"[DRY-RUN] Would create: {useragents_path}")
     else:
-        useragents_path.write_text(useragents_content)
+        with useragents_path.open("w", encoding="utf-8", buffering=1 << 16) as f:
+            write_useragents_md(
+                f, project_path, tech_stacks, conventions, structure, timestamp
+            )
         print(f"✅ Created: {useragents_path}")
     print()
 
     # Step 5: Update AGENTS.md/CLAUDE.md
     print("🔧 Updating agent configuration...")
-    update_agents_file(project_path, args.dry_run)
+    update_agents_file(project_path, args.dry_run, top_names)
     print()
 
     # Step 7: Update .gitignore
     gitignore_path = project_path / ".gitignore"
     tech_info_pattern = "TECH_INFO.md"
 
-    if gitignore_path.exists():
+    if ".gitignore" in top_names:
         gitignore_content = gitignore_path.read_text()
         if tech_info_pattern not in gitignore_content:
             if args.dry_run:
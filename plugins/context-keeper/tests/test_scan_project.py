@@ -0,0 +1,53 @@
+"""Regression tests for scan_project tech stack detection."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "skill" / "scripts"))
+
+import scan_project  # noqa: E402
+
+
+class DetectTechStackTest(unittest.TestCase):
+    def setUp(self):
+        scan_project._read_package_json.cache_clear()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        scan_project._read_package_json.cache_clear()
+
+    def write_package_json(self, pkg):
+        (self.project / "package.json").write_text(json.dumps(pkg))
+
+    def test_non_dict_dependencies_are_ignored(self):
+        self.write_package_json({"dependencies": 5, "devDependencies": ["react"]})
+        self.assertEqual(scan_project.detect_tech_stack(self.project), ["javascript"])
+
+    def test_dict_dependencies_still_detected(self):
+        self.write_package_json(
+            {"dependencies": {"react": "^18"}, "devDependencies": "typescript"}
+        )
+        self.assertEqual(
+            scan_project.detect_tech_stack(self.project), ["javascript", "react"]
+        )
+
+    def test_package_json_directory(self):
+        (self.project / "package.json").mkdir()
+        self.assertEqual(scan_project.detect_tech_stack(self.project), ["javascript"])
+
+    def test_unreadable_package_json(self):
+        self.write_package_json({"dependencies": {"react": "^18"}})
+        with mock.patch.object(Path, "read_bytes", side_effect=PermissionError):
+            self.assertEqual(
+                scan_project.detect_tech_stack(self.project), ["javascript"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
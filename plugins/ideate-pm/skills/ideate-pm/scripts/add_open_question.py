@@ -12,8 +12,9 @@ from pathlib import Path
 from compile_views import compile_views
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
+_VIEWS_DIR = _SKILL_ROOT / "product" / "views"
 
 
 def main() -> None:
@@ -36,10 +37,7 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = skill_root / "product" / "memory.sqlite"
-    views_dir = skill_root / "product" / "views"
-    if not db_path.exists():
+    if not _DB_PATH.exists():
         raise SystemExit(
             'Repo product is not initialized. Run: python scripts/init_product.py --title "..."'
         )
@@ -49,16 +47,21 @@ def main() -> None:
     if not q:
         raise SystemExit("--question cannot be empty")
 
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO open_question (scope_type, scope_ref, question, severity) VALUES (?, ?, ?, ?);",
-        (args.scope, scope_ref, q, args.severity),
-    )
-    conn.commit()
-    conn.close()
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
+    conn = sqlite_env.sqlite.connect(_DB_PATH)
+    try:
+        sqlite_env.tune(conn)
+        # The connection context manager commits, or rolls back on error
+        with conn:
+            conn.execute(
+                "INSERT INTO open_question (scope_type, scope_ref, question, severity) VALUES (?, ?, ?, ?);",
+                (args.scope, scope_ref, q, args.severity),
+            )
+    finally:
+        conn.close()
 
-    compile_views(db_path=db_path, views_dir=views_dir)
+    compile_views(db_path=_DB_PATH, views_dir=_VIEWS_DIR, views=("OPEN_QUESTIONS",))
     print("Recorded open question.")
 
 
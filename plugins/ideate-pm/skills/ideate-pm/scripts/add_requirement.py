@@ -16,26 +16,29 @@ from pathlib import Path
 from compile_views import compile_views
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
-
-
-def _next_req_id(cur: sqlite3.Cursor) -> str:
-    """Allocate the next human-friendly requirement id.
-
-    Uses the last inserted requirement's req_id if present; otherwise starts at 001.
-    This avoids collisions if requirements are ever deleted.
-    """
-    cur.execute("SELECT req_id FROM requirement ORDER BY id DESC LIMIT 1;")
-    row = cur.fetchone()
-    if not row or not row[0]:
-        return "R-001"
-    last = str(row[0])
-    try:
-        n = int(last.split("-")[-1])
-    except Exception:
-        n = 0
-    return f"R-{n + 1:03d}"
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
+_VIEWS_DIR = _SKILL_ROOT / "product" / "views"
+
+
+# Allocates the next human-friendly requirement id inside the INSERT itself.
+# It continues from the last inserted requirement's req_id (or starts at
+# R-001), which avoids collisions if requirements are ever deleted; a
+# non-numeric suffix CASTs to 0, matching the old Python fallback.
+_INSERT_REQUIREMENT_SQL = """
+INSERT INTO requirement (req_id, title, description, status, priority)
+VALUES (
+  printf(
+    'R-%03d',
+    COALESCE(
+      (SELECT CAST(substr(req_id, 3) AS INTEGER)
+       FROM requirement ORDER BY id DESC LIMIT 1),
+      0
+    ) + 1
+  ),
+  ?, ?, 'PROPOSED', ?
+);
+"""
 
 
 def main() -> None:
@@ -47,10 +50,7 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = skill_root / "product" / "memory.sqlite"
-    views_dir = skill_root / "product" / "views"
-    if not db_path.exists():
+    if not _DB_PATH.exists():
         raise SystemExit(
             'Repo product is not initialized. Run: python scripts/init_product.py --title "..."'
         )
@@ -59,17 +59,31 @@ def main() -> None:
     title = title.replace("\n", " ")[:60]
     description = args.description.strip()
 
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    req_id = _next_req_id(cur)
-    cur.execute(
-        "INSERT INTO requirement (req_id, title, description, status, priority) VALUES (?, ?, ?, 'PROPOSED', ?);",
-        (req_id, title, description, args.priority),
-    )
-    conn.commit()
-    conn.close()
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
 
-    compile_views(db_path=db_path, views_dir=views_dir)
+    # Autocommit mode with an explicit BEGIN IMMEDIATE so the insert and the
+    # read-back of its req_id form one transaction
+    conn = sqlite_env.sqlite.connect(_DB_PATH, isolation_level=None)
+    sqlite_env.tune(conn)
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE;")
+    try:
+        cur.execute(_INSERT_REQUIREMENT_SQL, (title, description, args.priority))
+        # Read the id back by rowid (RETURNING needs SQLite 3.35+)
+        cur.execute("SELECT req_id FROM requirement WHERE id = ?;", (cur.lastrowid,))
+        req_id = cur.fetchone()[0]
+        cur.execute("COMMIT;")
+    except Exception:
+        # SQLite may already have rolled back; a second ROLLBACK would mask
+        # the original error
+        if conn.in_transaction:
+            cur.execute("ROLLBACK;")
+        raise
+    finally:
+        conn.close()
+
+    compile_views(db_path=_DB_PATH, views_dir=_VIEWS_DIR, views=("BACKLOG",))
 
     print(f"Added requirement {req_id} (status=PROPOSED, priority={args.priority})")
 
@@ -5,19 +5,22 @@
 Design intent
 - The database is the authoritative store.
 - Views are derived artifacts for quick human review.
-- This script is deterministic and idempotent.
+- This script is deterministic and idempotent; a view whose content is
+  unchanged is left untouched on disk.
 """
 
 from __future__ import annotations
 
+import sqlite3 as sqlite3_types
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
+_VIEWS_DIR = _SKILL_ROOT / "product" / "views"
 
 
 @dataclass(frozen=True)
@@ -27,61 +30,142 @@ class RequirementRow:
     description: str
     status: str
     priority: str
+    # Description flattened to one line and cut to SUMMARY_LEN + 1 chars in
+    # SQL; the extra char tells the renderer whether to add an ellipsis
+    summary: str
+    # Acceptance texts joined with _ACCEPT_SEP, or None when there are none
+    acceptance_text: Optional[str]
 
+    def acceptance(self) -> List[str]:
+        return self.acceptance_text.split(_ACCEPT_SEP) if self.acceptance_text else []
 
-def _load_meta(cur: sqlite3.Cursor) -> Dict[str, str]:
-    cur.execute("SELECT key, value FROM meta;")
-    return {k: (v or "") for (k, v) in cur.fetchall()}
 
+# Max characters of a requirement description shown in the backlog summary
+SUMMARY_LEN = 120
 
-def _load_requirements(cur: sqlite3.Cursor) -> List[RequirementRow]:
-    cur.execute(
-        "SELECT req_id, title, description, status, priority FROM requirement ORDER BY id ASC;"
-    )
-    return [RequirementRow(*row) for row in cur.fetchall()]
+# Separator for GROUP_CONCAT'd acceptance texts (ASCII unit separator)
+_ACCEPT_SEP = "\x1f"
+
+# View names accepted by compile_views(views=...); each maps to <NAME>.md
+VIEW_NAMES = ("PRODUCT", "BACKLOG", "OPEN_QUESTIONS")
+
+
+def _load_meta(cur: sqlite3_types.Cursor) -> Dict[str, str]:
+    return {
+        row["key"]: (row["value"] or "")
+        for row in cur.execute("SELECT key, value FROM meta;")
+    }
 
 
-def _load_acceptance(cur: sqlite3.Cursor) -> Dict[str, List[str]]:
-    # Map req_id -> acceptance list
+def _load_requirements(cur: sqlite3_types.Cursor) -> List[RequirementRow]:
+    # trim() strips the same ASCII whitespace as str.strip() before newlines
+    # are flattened, mirroring the previous Python-side summary. Acceptance
+    # criteria come back in the same row; the ordered inner SELECT (served by
+    # idx_acc_req_id) keeps them in insertion order inside GROUP_CONCAT.
     cur.execute(
         """
-        SELECT r.req_id, a.text
-        FROM acceptance a
-        JOIN requirement r ON r.id = a.requirement_id
-        ORDER BY r.id ASC, a.id ASC;
-        """
+        SELECT r.req_id, r.title, r.description, r.status, r.priority,
+               substr(
+                 replace(trim(r.description, char(32, 9, 10, 11, 12, 13)), char(10), ' '),
+                 1, ?
+               ) AS summary,
+               (
+                 SELECT GROUP_CONCAT(text, CHAR(31))
+                 FROM (
+                   SELECT a.text AS text
+                   FROM acceptance a
+                   WHERE a.requirement_id = r.id
+                   ORDER BY a.id ASC
+                 )
+               ) AS acceptance_text
+        FROM requirement r
+        ORDER BY r.id ASC;
+        """,
+        (SUMMARY_LEN + 1,),
     )
-    out: Dict[str, List[str]] = {}
-    for req_id, text in cur.fetchall():
-        out.setdefault(req_id, []).append(text)
-    return out
+    return [
+        RequirementRow(
+            row["req_id"],
+            row["title"],
+            row["description"],
+            row["status"],
+            row["priority"],
+            row["summary"] or "",
+            row["acceptance_text"],
+        )
+        for row in cur
+    ]
 
 
-def _load_open_questions(cur: sqlite3.Cursor) -> List[Tuple[str, str, str]]:
+def _load_open_questions(cur: sqlite3_types.Cursor) -> List[Tuple[str, str, str]]:
     # (scope_type, scope_ref, question)
     cur.execute(
         "SELECT scope_type, scope_ref, question FROM open_question WHERE resolved_by_decision_id IS NULL ORDER BY id ASC;"
     )
-    return [(a or "", b or "", c or "") for (a, b, c) in cur.fetchall()]
+    return [
+        (row["scope_type"] or "", row["scope_ref"] or "", row["question"] or "")
+        for row in cur
+    ]
+
 
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Write `text` to `path` unless the file already holds exactly that content.
+
+    Returns True when the file was (re)written.
+    """
+    data = text.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+def compile_views(
+    db_path: Path, views_dir: Path, views: Optional[Iterable[str]] = None
+) -> None:
+    """Compile the Markdown views.
+
+    `views` limits compilation to a subset of VIEW_NAMES (default: all), so a
+    caller whose mutation can only affect one view skips loading and
+    rewriting the others.
+    """
+    selected = set(VIEW_NAMES if views is None else views)
+    unknown = selected.difference(VIEW_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown view(s): {', '.join(sorted(unknown))}")
+    if not selected:
+        return
 
-def compile_views(db_path: Path, views_dir: Path) -> None:
     views_dir.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
+    # Resolved per call so importing this module does not probe SQLite
+    sqlite_env = load_sqlite_with_fts()
+    conn = sqlite_env.sqlite.connect(db_path)
+    sqlite_env.tune_reader(conn)
+    conn.row_factory = sqlite_env.sqlite.Row
     cur = conn.cursor()
 
-    meta = _load_meta(cur)
-    reqs = _load_requirements(cur)
-    acc = _load_acceptance(cur)
-    openqs = _load_open_questions(cur)
+    meta = _load_meta(cur) if "PRODUCT" in selected else {}
+    reqs = _load_requirements(cur) if "BACKLOG" in selected else []
+    openqs = _load_open_questions(cur) if "OPEN_QUESTIONS" in selected else []
     conn.close()
 
+    if "PRODUCT" in selected:
+        _compile_product(views_dir, meta)
+    if "BACKLOG" in selected:
+        _compile_backlog(views_dir, reqs)
+    if "OPEN_QUESTIONS" in selected:
+        _compile_open_questions(views_dir, openqs)
+
+
+def _compile_product(views_dir: Path, meta: Dict[str, str]) -> None:
     title = meta.get("title") or "(Untitled Product)"
     vision = meta.get("vision") or "TBD"
     constraints = meta.get("constraints") or ""
 
-    # PRODUCT.md
     product_md = views_dir / "PRODUCT.md"
     lines: List[str] = [f"# {title}", "", f"**Vision**: {vision}", ""]
     if constraints.strip():
@@ -93,17 +177,19 @@ def compile_views(db_path: Path, views_dir: Path) -> None:
         "- This file is compiled from the SQLite database.",
         "",
     ]
-    product_md.write_text("\n".join(lines), encoding="utf-8")
+    _write_if_changed(product_md, "\n".join(lines))
+
 
-    # BACKLOG.md
+def _compile_backlog(views_dir: Path, reqs: List[RequirementRow]) -> None:
     backlog_md = views_dir / "BACKLOG.md"
     lines = ["# Backlog", "", "Summary list:", ""]
     if not reqs:
         lines += ["(No requirements yet)", ""]
     else:
         for r in reqs:
-            summary = (r.description or "").strip().replace("\n", " ")
-            summary = summary[:120] + ("…" if len(summary) > 120 else "")
+            summary = r.summary[:SUMMARY_LEN] + (
+                "…" if len(r.summary) > SUMMARY_LEN else ""
+            )
             lines.append(
                 f"- `{r.req_id}` [{r.status}, {r.priority}] {r.title} — {summary}"
             )
@@ -118,7 +204,7 @@ def compile_views(db_path: Path, views_dir: Path) -> None:
                 (r.description or "").strip() or "(No description)",
                 "",
             ]
-            items = acc.get(r.req_id, [])
+            items = r.acceptance()
             lines.append("**Acceptance Criteria**:")
             lines.append("")
             if items:
@@ -132,9 +218,12 @@ def compile_views(db_path: Path, views_dir: Path) -> None:
                 f"**Priority**: {r.priority}",
                 "",
             ]
-    backlog_md.write_text("\n".join(lines), encoding="utf-8")
+    _write_if_changed(backlog_md, "\n".join(lines))
+
 
-    # OPEN_QUESTIONS.md
+def _compile_open_questions(
+    views_dir: Path, openqs: List[Tuple[str, str, str]]
+) -> None:
     openq_md = views_dir / "OPEN_QUESTIONS.md"
     lines = ["# Open Questions", ""]
     if not openqs:
@@ -159,7 +248,7 @@ def compile_views(db_path: Path, views_dir: Path) -> None:
                 for q in grouped[scope_ref]:
                     lines.append(f"- {q}")
                 lines.append("")
-    openq_md.write_text("\n".join(lines), encoding="utf-8")
+    _write_if_changed(openq_md, "\n".join(lines))
 
 
 def main() -> None:
@@ -174,9 +263,8 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = Path(args.db) if args.db else (skill_root / "product" / "memory.sqlite")
-    views_dir = Path(args.views) if args.views else (skill_root / "product" / "views")
+    db_path = Path(args.db) if args.db else _DB_PATH
+    views_dir = Path(args.views) if args.views else _VIEWS_DIR
     compile_views(db_path=db_path, views_dir=views_dir)
 
 
@@ -12,211 +12,235 @@ view compilation, question generation, and graph/fts layers can be added later.
 """
 
 import argparse
+import sqlite3 as sqlite3_types
 from pathlib import Path
 
 from compile_views import compile_views
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
+_VIEWS_DIR = _SKILL_ROOT / "product" / "views"
+
+_FTS_TABLES = ("requirement_fts", "decision_fts", "open_question_fts")
+# PRAGMA user_version recorded once the FTS tables have been rebuilt with
+# trigram; informational only, the migration checks the tables themselves
+_TRIGRAM_SCHEMA_VERSION = 1
+
+# Base tables and indexes. Every statement is idempotent so the script can be
+# re-run against an existing database.
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+
+CREATE TABLE IF NOT EXISTS requirement (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  req_id TEXT UNIQUE,
+  title TEXT,
+  description TEXT,
+  status TEXT DEFAULT 'PROPOSED',
+  priority TEXT DEFAULT 'P2',
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS acceptance (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  requirement_id INTEGER,
+  text TEXT,
+  type TEXT DEFAULT 'CHECKLIST',
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS decision (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  scope_type TEXT,
+  scope_ref TEXT,
+  question TEXT,
+  choice TEXT,
+  rationale TEXT,
+  confidence REAL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS open_question (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  scope_type TEXT,
+  scope_ref TEXT,
+  question TEXT,
+  severity TEXT DEFAULT 'medium',
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  resolved_by_decision_id INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS entity (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  type TEXT,
+  name TEXT,
+  payload_json TEXT
+);
+
+CREATE TABLE IF NOT EXISTS edge (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  src_entity_id INTEGER,
+  rel TEXT,
+  dst_entity_id INTEGER,
+  evidence_ref TEXT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Secondary indexes matching the compile_views read paths
+CREATE INDEX IF NOT EXISTS idx_acc_req_id ON acceptance(requirement_id, id);
+
+CREATE INDEX IF NOT EXISTS idx_openq_unresolved ON open_question(id)
+WHERE resolved_by_decision_id IS NULL;
+
+-- Covering indexes for the query_state.py listings (index-only scans)
+CREATE INDEX IF NOT EXISTS idx_req_listing ON requirement(req_id, title, status, priority);
+
+CREATE INDEX IF NOT EXISTS idx_oq_listing
+ON open_question(created_at, id, scope_type, scope_ref, severity, question);
+"""
 
+# FTS5 tables and their sync triggers; {tokenizer} is filled per SQLite build
+_FTS_SCHEMA_SQL = """
+-- FTS5 full-text search tables (external content mode)
+CREATE VIRTUAL TABLE IF NOT EXISTS requirement_fts USING fts5(
+  req_id, title, description,
+  content='requirement',
+  content_rowid='id',
+  tokenize='{tokenizer}'
+);
+
+CREATE TRIGGER IF NOT EXISTS requirement_ai AFTER INSERT ON requirement BEGIN
+  INSERT INTO requirement_fts(rowid, req_id, title, description)
+  VALUES (NEW.id, NEW.req_id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS requirement_au AFTER UPDATE ON requirement BEGIN
+  INSERT INTO requirement_fts(requirement_fts, rowid, req_id, title, description)
+  VALUES ('delete', OLD.id, OLD.req_id, OLD.title, OLD.description);
+  INSERT INTO requirement_fts(rowid, req_id, title, description)
+  VALUES (NEW.id, NEW.req_id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS requirement_ad AFTER DELETE ON requirement BEGIN
+  INSERT INTO requirement_fts(requirement_fts, rowid, req_id, title, description)
+  VALUES ('delete', OLD.id, OLD.req_id, OLD.title, OLD.description);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS decision_fts USING fts5(
+  question, choice, rationale,
+  content='decision',
+  content_rowid='id',
+  tokenize='{tokenizer}'
+);
+
+CREATE TRIGGER IF NOT EXISTS decision_ai AFTER INSERT ON decision BEGIN
+  INSERT INTO decision_fts(rowid, question, choice, rationale)
+  VALUES (NEW.id, NEW.question, NEW.choice, NEW.rationale);
+END;
+
+CREATE TRIGGER IF NOT EXISTS decision_au AFTER UPDATE ON decision BEGIN
+  INSERT INTO decision_fts(decision_fts, rowid, question, choice, rationale)
+  VALUES ('delete', OLD.id, OLD.question, OLD.choice, OLD.rationale);
+  INSERT INTO decision_fts(rowid, question, choice, rationale)
+  VALUES (NEW.id, NEW.question, NEW.choice, NEW.rationale);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS open_question_fts USING fts5(
+  question,
+  content='open_question',
+  content_rowid='id',
+  tokenize='{tokenizer}'
+);
+
+CREATE TRIGGER IF NOT EXISTS open_question_ai AFTER INSERT ON open_question BEGIN
+  INSERT INTO open_question_fts(rowid, question)
+  VALUES (NEW.id, NEW.question);
+END;
+
+CREATE TRIGGER IF NOT EXISTS open_question_au AFTER UPDATE ON open_question BEGIN
+  INSERT INTO open_question_fts(open_question_fts, rowid, question)
+  VALUES ('delete', OLD.id, OLD.question);
+  INSERT INTO open_question_fts(rowid, question)
+  VALUES (NEW.id, NEW.question);
+END;
+"""
 
-def _ensure_schema(cur: sqlite3.Cursor) -> None:
-    cur.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);")
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS requirement (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          req_id TEXT UNIQUE,
-          title TEXT,
-          description TEXT,
-          status TEXT DEFAULT 'PROPOSED',
-          priority TEXT DEFAULT 'P2',
-          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-          updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS acceptance (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          requirement_id INTEGER,
-          text TEXT,
-          type TEXT DEFAULT 'CHECKLIST',
-          created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS decision (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          scope_type TEXT,
-          scope_ref TEXT,
-          question TEXT,
-          choice TEXT,
-          rationale TEXT,
-          confidence REAL,
-          created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS open_question (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          scope_type TEXT,
-          scope_ref TEXT,
-          question TEXT,
-          severity TEXT DEFAULT 'medium',
-          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-          resolved_by_decision_id INTEGER
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS entity (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          type TEXT,
-          name TEXT,
-          payload_json TEXT
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS edge (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          src_entity_id INTEGER,
-          rel TEXT,
-          dst_entity_id INTEGER,
-          evidence_ref TEXT,
-          created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-    )
 
-    # FTS5 full-text search tables (external content mode)
-    cur.execute(
-        """
-        CREATE VIRTUAL TABLE IF NOT EXISTS requirement_fts USING fts5(
-          req_id, title, description,
-          content='requirement',
-          content_rowid='id'
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS requirement_ai AFTER INSERT ON requirement BEGIN
-          INSERT INTO requirement_fts(rowid, req_id, title, description)
-          VALUES (NEW.id, NEW.req_id, NEW.title, NEW.description);
-        END;
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS requirement_au AFTER UPDATE ON requirement BEGIN
-          INSERT INTO requirement_fts(requirement_fts, rowid, req_id, title, description)
-          VALUES ('delete', OLD.id, OLD.req_id, OLD.title, OLD.description);
-          INSERT INTO requirement_fts(rowid, req_id, title, description)
-          VALUES (NEW.id, NEW.req_id, NEW.title, NEW.description);
-        END;
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS requirement_ad AFTER DELETE ON requirement BEGIN
-          INSERT INTO requirement_fts(requirement_fts, rowid, req_id, title, description)
-          VALUES ('delete', OLD.id, OLD.req_id, OLD.title, OLD.description);
-        END;
-        """
-    )
+def _has_non_trigram_fts(cur: sqlite3_types.Cursor) -> bool:
+    """Return True if any existing FTS table was created without trigram."""
     cur.execute(
-        """
-        CREATE VIRTUAL TABLE IF NOT EXISTS decision_fts USING fts5(
-          question, choice, rationale,
-          content='decision',
-          content_rowid='id'
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS decision_ai AFTER INSERT ON decision BEGIN
-          INSERT INTO decision_fts(rowid, question, choice, rationale)
-          VALUES (NEW.id, NEW.question, NEW.choice, NEW.rationale);
-        END;
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS decision_au AFTER UPDATE ON decision BEGIN
-          INSERT INTO decision_fts(decision_fts, rowid, question, choice, rationale)
-          VALUES ('delete', OLD.id, OLD.question, OLD.choice, OLD.rationale);
-          INSERT INTO decision_fts(rowid, question, choice, rationale)
-          VALUES (NEW.id, NEW.question, NEW.choice, NEW.rationale);
-        END;
-        """
-    )
-    cur.execute(
-        """
-        CREATE VIRTUAL TABLE IF NOT EXISTS open_question_fts USING fts5(
-          question,
-          content='open_question',
-          content_rowid='id'
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS open_question_ai AFTER INSERT ON open_question BEGIN
-          INSERT INTO open_question_fts(rowid, question)
-          VALUES (NEW.id, NEW.question);
-        END;
-        """
-    )
-    cur.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS open_question_au AFTER UPDATE ON open_question BEGIN
-          INSERT INTO open_question_fts(open_question_fts, rowid, question)
-          VALUES ('delete', OLD.id, OLD.question);
-          INSERT INTO open_question_fts(rowid, question)
-          VALUES (NEW.id, NEW.question);
-        END;
-        """
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN (?, ?, ?);",
+        _FTS_TABLES,
     )
+    return any("trigram" not in (sql or "").lower() for (sql,) in cur.fetchall())
+
+
+def _ensure_schema(cur: sqlite3_types.Cursor, tokenizer: str) -> None:
+    """Create (or upgrade) the schema with one executescript in one transaction."""
+    # One-shot migration: FTS tables created before the trigram tokenizer
+    # (as recorded in sqlite_master) are dropped and rebuilt from their
+    # content tables
+    migrate_fts = tokenizer == "trigram" and _has_non_trigram_fts(cur)
+
+    script = ["BEGIN;", _SCHEMA_SQL]
+    if migrate_fts:
+        script += [f"DROP TABLE IF EXISTS {table};" for table in _FTS_TABLES]
+    script.append(_FTS_SCHEMA_SQL.format(tokenizer=tokenizer))
+    if migrate_fts:
+        script += [
+            f"INSERT INTO {table}({table}) VALUES('rebuild');" for table in _FTS_TABLES
+        ]
+        script.append(f"PRAGMA user_version = {_TRIGRAM_SCHEMA_VERSION};")
+    script.append("COMMIT;")
+    cur.executescript("\n".join(script))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Initialize repo-scoped product storage"
     )
-    parser.add_argument("--title", required=True, help="Product name")
-    parser.add_argument("--vision", default="", help="Optional product vision")
+    parser.add_argument(
+        "--title",
+        default=None,
+        help="Product name (required for a new product; omit to keep the current one)",
+    )
+    parser.add_argument(
+        "--vision",
+        default=None,
+        help="Optional product vision (omit to keep the current one)",
+    )
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    base_dir = skill_root / "product"
-    views_dir = base_dir / "views"
-    db_path = base_dir / "memory.sqlite"
-    views_dir.mkdir(parents=True, exist_ok=True)
+    # Re-running on an existing product (e.g., to upgrade the schema) only
+    # overwrites the meta fields that were passed explicitly
+    is_new = not _DB_PATH.exists()
+    if is_new and args.title is None:
+        parser.error("--title is required to initialize a new product")
+
+    _VIEWS_DIR.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
+
+    conn = sqlite_env.sqlite.connect(_DB_PATH)
+    sqlite_env.tune(conn)
     cur = conn.cursor()
-    _ensure_schema(cur)
-    cur.execute(
-        "INSERT OR REPLACE INTO meta(key, value) VALUES('title', ?);", (args.title,)
-    )
-    cur.execute(
-        "INSERT OR REPLACE INTO meta(key, value) VALUES('vision', ?);", (args.vision,)
-    )
+    _ensure_schema(cur, sqlite_env.tokenizer or "unicode61")
+    if args.title is not None:
+        cur.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('title', ?);", (args.title,)
+        )
+    if args.vision is not None or is_new:
+        cur.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('vision', ?);",
+            (args.vision or "",),
+        )
     conn.commit()
     conn.close()
 
-    compile_views(db_path=db_path, views_dir=views_dir)
+    compile_views(db_path=_DB_PATH, views_dir=_VIEWS_DIR)
     print("Initialized repo-scoped product storage at product/")
 
 
@@ -7,17 +7,23 @@ copying into a conversation.
 """
 
 import argparse
+import sqlite3 as sqlite3_types
+import sys
 from pathlib import Path
 
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
 
 
-def _meta(cur: sqlite3.Cursor) -> dict:
-    cur.execute("SELECT key, value FROM meta;")
-    return {k: v for (k, v) in cur.fetchall()}
+def _meta(cur: sqlite3_types.Cursor) -> dict:
+    # dict() consumes the (key, value) rows straight off the cursor
+    return dict(cur.execute("SELECT key, value FROM meta;"))
+
+
+def _scope_label(scope_type: str, scope_ref) -> str:
+    return scope_type if scope_ref in ("", None) else f"{scope_type}:{scope_ref}"
 
 
 def main() -> None:
@@ -25,52 +31,55 @@ def main() -> None:
     parser.add_argument("--full", action="store_true", help="Include open questions")
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = skill_root / "product" / "memory.sqlite"
-    if not db_path.exists():
+    if not _DB_PATH.exists():
         raise SystemExit(
             'Repo product is not initialized. Run: python scripts/init_product.py --title "..."'
         )
 
-    conn = sqlite3.connect(db_path)
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
+
+    # Not mode=ro: only a read-write connection can checkpoint and remove the
+    # -wal/-shm files when it is the last one to close
+    conn = sqlite_env.sqlite.connect(_DB_PATH)
+    sqlite_env.tune_reader(conn)
     cur = conn.cursor()
 
     meta = _meta(cur)
     title = meta.get("title") or "(Untitled Product)"
     vision = meta.get("vision") or "TBD"
 
-    print(f"# {title}")
-    print(f"Vision: {vision}")
-    print("\n## Requirements")
+    # Lines are collected and written once instead of one print() per row
+    out = [f"# {title}", f"Vision: {vision}", "\n## Requirements"]
 
     cur.execute(
         "SELECT req_id, title, status, priority FROM requirement ORDER BY req_id;"
     )
     rows = cur.fetchall()
     if not rows:
-        print("No requirements recorded.")
+        out.append("No requirements recorded.")
     else:
-        for req_id, rtitle, status, priority in rows:
-            print(f"- {req_id}: {rtitle} ({status}, {priority})")
+        out += [
+            f"- {req_id}: {rtitle} ({status}, {priority})"
+            for req_id, rtitle, status, priority in rows
+        ]
 
     if args.full:
-        print("\n## Open questions")
+        out.append("\n## Open questions")
         cur.execute(
-            "SELECT scope_type, scope_ref, severity, question FROM open_question ORDER BY created_at;"
+            "SELECT scope_type, scope_ref, severity, question FROM open_question ORDER BY created_at, id;"
         )
         qs = cur.fetchall()
         if not qs:
-            print("No open questions.")
+            out.append("No open questions.")
         else:
-            for scope_type, scope_ref, severity, q in qs:
-                scope = (
-                    scope_type
-                    if scope_ref in ("", None)
-                    else f"{scope_type}:{scope_ref}"
-                )
-                print(f"- [{severity}] {scope}: {q}")
+            out += [
+                f"- [{severity}] {_scope_label(scope_type, scope_ref)}: {q}"
+                for scope_type, scope_ref, severity, q in qs
+            ]
 
     conn.close()
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
@@ -14,8 +14,8 @@ from pathlib import Path
 
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
 
 
 def main() -> None:
@@ -37,9 +37,7 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = skill_root / "product" / "memory.sqlite"
-    if not db_path.exists():
+    if not _DB_PATH.exists():
         raise SystemExit(
             'Repo product is not initialized. Run: python scripts/init_product.py --title "..."'
         )
@@ -54,14 +52,19 @@ def main() -> None:
     if conf > 1.0:
         conf = 1.0
 
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO decision (scope_type, scope_ref, question, choice, rationale, confidence) VALUES (?, ?, ?, ?, ?, ?);",
-        (args.scope, scope_ref, q, c, r, conf),
-    )
-    conn.commit()
-    conn.close()
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
+    conn = sqlite_env.sqlite.connect(_DB_PATH)
+    try:
+        sqlite_env.tune(conn)
+        # The connection context manager commits, or rolls back on error
+        with conn:
+            conn.execute(
+                "INSERT INTO decision (scope_type, scope_ref, question, choice, rationale, confidence) VALUES (?, ?, ?, ?, ?, ?);",
+                (args.scope, scope_ref, q, c, r, conf),
+            )
+    finally:
+        conn.close()
 
     print("Recorded decision.")
 
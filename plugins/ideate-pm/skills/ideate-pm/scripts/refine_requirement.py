@@ -15,8 +15,17 @@ from pathlib import Path
 from compile_views import compile_views
 from sqlite_support import load_sqlite_with_fts
 
-sqlite_env = load_sqlite_with_fts()
-sqlite3 = sqlite_env.sqlite
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
+_VIEWS_DIR = _SKILL_ROOT / "product" / "views"
+
+# (argparse dest, SET fragment) for each optional field, in column order
+_FIELD_SQL = (
+    ("title", "title = ?"),
+    ("description", "description = ?"),
+    ("priority", "priority = ?"),
+    ("status", "status = ?"),
+)
 
 
 def main() -> None:
@@ -47,54 +56,56 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = skill_root / "product" / "memory.sqlite"
-    views_dir = skill_root / "product" / "views"
-    if not db_path.exists():
+    if not _DB_PATH.exists():
         raise SystemExit(
             'Repo product is not initialized. Run: python scripts/init_product.py --title "..."'
         )
 
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM requirement WHERE req_id = ?;", (args.id,))
-    row = cur.fetchone()
-    if not row:
-        raise SystemExit(f"Requirement not found: {args.id}")
-    req_db_id = int(row[0])
-
-    updates = []
-    params = []
-    if args.title:
-        updates.append("title = ?")
-        params.append(args.title.strip())
-    if args.description:
-        updates.append("description = ?")
-        params.append(args.description.strip())
-    if args.priority:
-        updates.append("priority = ?")
-        params.append(args.priority)
-    if args.status:
-        updates.append("status = ?")
-        params.append(args.status)
-    if updates:
-        updates.append("updated_at = CURRENT_TIMESTAMP")
-        sql = "UPDATE requirement SET " + ", ".join(updates) + " WHERE id = ?;"
-        params.append(req_db_id)
-        cur.execute(sql, tuple(params))
-
-    for item in args.add_accept:
-        text = item.strip()
-        if text:
-            cur.execute(
-                "INSERT INTO acceptance (requirement_id, text, type) VALUES (?, ?, ?);",
-                (req_db_id, text, args.accept_type),
-            )
-
-    conn.commit()
-    conn.close()
-
-    compile_views(db_path=db_path, views_dir=views_dir)
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
+    conn = sqlite_env.sqlite.connect(_DB_PATH)
+    try:
+        sqlite_env.tune(conn)
+        # The connection context manager commits, or rolls back on error
+        with conn:
+            row = conn.execute(
+                "SELECT id FROM requirement WHERE req_id = ?;", (args.id,)
+            ).fetchone()
+            if not row:
+                raise SystemExit(f"Requirement not found: {args.id}")
+            req_db_id = int(row[0])
+
+            # priority/status are argparse choices, so strip() is a no-op there
+            updates = [
+                (fragment, getattr(args, name).strip())
+                for name, fragment in _FIELD_SQL
+                if getattr(args, name)
+            ]
+            if updates:
+                sql = (
+                    "UPDATE requirement SET "
+                    + ", ".join(fragment for fragment, _ in updates)
+                    + ", updated_at = CURRENT_TIMESTAMP WHERE id = ?;"
+                )
+                conn.execute(sql, (*(value for _, value in updates), req_db_id))
+
+            accept_rows = [
+                (req_db_id, item.strip(), args.accept_type)
+                for item in args.add_accept
+                if item.strip()
+            ]
+            if accept_rows:
+                conn.executemany(
+                    "INSERT INTO acceptance (requirement_id, text, type) VALUES (?, ?, ?);",
+                    accept_rows,
+                )
+    finally:
+        conn.close()
+
+    # Requirements and their acceptance criteria are only rendered in the
+    # backlog; with no change flags there is nothing to recompile
+    if updates or accept_rows:
+        compile_views(db_path=_DB_PATH, views_dir=_VIEWS_DIR, views=("BACKLOG",))
     print(f"Updated {args.id}. Added acceptance items: {len(args.add_accept)}")
 
 
@@ -4,32 +4,66 @@
 Uses SQLite FTS5 for fast semantic-like queries. Supports searching across
 multiple scopes (requirement, decision, question) or a specific one.
 
-For better multilingual search (e.g., CJK languages), queries are automatically
-converted to prefix matching (e.g., "pay" -> "pay*").
+Databases initialized on SQLite 3.34+ index text with the FTS5 `trigram`
+tokenizer, which matches any substring of 3+ characters (including CJK) as-is.
+Older unicode61 indexes get prefix matching instead (e.g., "pay" -> "pay*").
+On trigram indexes each query runs through exactly one backend: FTS5 when it
+can serve the query, LIKE when a term is shorter than the 3 characters a
+trigram index needs. unicode61 indexes cannot match CJK or mid-word text, so
+a query with no FTS hit there falls back to LIKE. LIKE is also used when FTS5
+is missing or `--mode like` is given.
 
 Usage examples:
     python scripts/search.py --query "payment"
     python scripts/search.py --query "payment" --scope requirement
     python scripts/search.py --query "why change" --scope decision
+    python scripts/search.py --query "payment" --limit 10
 """
 
 import argparse
 import os
 import sqlite3 as sqlite3_types
+import sys
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
-from sqlite_support import load_sqlite_with_fts
+from sqlite_support import SQLiteSupport, load_sqlite_with_fts
+
+_SKILL_ROOT = Path(__file__).resolve().parents[1]
+_DB_PATH = _SKILL_ROOT / "product" / "memory.sqlite"
 
 MODE_CHOICES = ("auto", "fts", "like")
+# Max results per scope unless --limit says otherwise
+DEFAULT_LIMIT = 50
+
 
-sqlite_env = load_sqlite_with_fts()
-runtime_sqlite = sqlite_env.sqlite
+def _uses_trigram(cur: sqlite3_types.Cursor) -> bool:
+    """Return True if the FTS tables were created with the trigram tokenizer."""
+    cur.execute("SELECT sql FROM sqlite_master WHERE name = 'requirement_fts';")
+    row = cur.fetchone()
+    return bool(row and row[0] and "trigram" in row[0].lower())
 
 
-def _prepare_fts_query(query: str) -> str:
-    """Prepare FTS5 query by adding prefix wildcard for better Chinese matching."""
-    tokens = query.split()
+def _prepare_fts_query(query: str, prefix: bool = True) -> str:
+    """Prepare FTS5 query.
+
+    With `prefix`, bare tokens get a trailing wildcard so unicode61 indexes
+    still match partial words; trigram indexes already match substrings and
+    pass the query through unchanged.
+    """
+    if not prefix:
+        return query
+    # Fast path: a single plain word needs no tokenizing
+    stripped = query.strip()
+    if (
+        stripped
+        and not any(c.isspace() for c in stripped)
+        and not stripped.startswith('"')
+        and not stripped.endswith("*")
+        and stripped not in ("AND", "OR", "NOT")
+    ):
+        return f"{stripped}*"
+    tokens = stripped.split()
     processed = []
     for token in tokens:
         if token.startswith('"') or token in ("AND", "OR", "NOT"):
@@ -41,96 +75,143 @@ def _prepare_fts_query(query: str) -> str:
     return " ".join(processed)
 
 
-def _like_pattern(query: str) -> str:
-    stripped = query.strip()
-    return f"%{stripped}%" if stripped else "%"
-
-
-def _search_requirements(
-    cur: sqlite3_types.Cursor, query: str, fts_enabled: bool
-) -> List[Tuple[str, str, str, str, str]]:
-    """Search requirements using FTS5 or LIKE fallback."""
-    if fts_enabled:
-        prepared_query = _prepare_fts_query(query)
-        sql = """
-            SELECT r.req_id, r.title, r.description, r.status, r.priority
-            FROM requirement_fts
-            JOIN requirement r ON r.id = requirement_fts.rowid
-            WHERE requirement_fts MATCH ?;
-        """
-        cur.execute(sql, (prepared_query,))
-        rows = cur.fetchall()
-        if rows:
-            return rows
+def _trigram_can_match(query: str) -> bool:
+    """Return True if every search term is long enough for a trigram index."""
+    terms = [
+        token.strip('"*')
+        for token in query.split()
+        if token not in ("AND", "OR", "NOT")
+    ]
+    return bool(terms) and all(len(term) >= 3 for term in terms)
+
+
+def _like_terms(query: str) -> Tuple[str, ...]:
+    """LIKE patterns for each query term; a bare AND is implied and dropped."""
+    return SQLiteSupport.like_params(
+        " ".join(token for token in query.split() if token != "AND")
+    )
 
-    pattern = _like_pattern(query)
-    sql = """
-        SELECT req_id, title, description, status, priority
+
+# bm25 column weights (in FTS column order): req_id, titles, questions and
+# choices count ten times the free-text description/rationale
+_RANK_REQUIREMENT = SQLiteSupport.bm25_expr("requirement_fts", 1.0, 10.0, 1.0)
+_RANK_DECISION = SQLiteSupport.bm25_expr("decision_fts", 10.0, 10.0, 1.0)
+_RANK_OPEN_QUESTION = SQLiteSupport.bm25_expr("open_question_fts")
+
+# scope -> (FTS5 query, LIKE fallback query, LIKE columns). The LIKE query's
+# {where} requires every query term to match at least one of the columns.
+# Both queries end with a LIMIT placeholder. FTS hits are ranked by the
+# weighted bm25 scores above and cut to the limit inside the FTS subquery,
+# then joined to the content table by integer primary key. Descriptions
+# and rationales are cut to their printed snippet length in SQL, so long
+# texts are not copied into Python only to be sliced.
+# SQLite's LIKE already folds ASCII case (like the built-in LOWER()), so the
+# columns are compared as-is without a per-row function call.
+SCOPES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "requirement": (
+        f"""
+        SELECT r.req_id, r.title,
+               substr(replace(r.description, char(10), ' '), 1, 200),
+               r.status, r.priority
+        FROM (
+          SELECT rowid, {_RANK_REQUIREMENT} AS score FROM requirement_fts
+          WHERE requirement_fts MATCH ?
+          ORDER BY score LIMIT ?
+        ) AS hit
+        JOIN requirement r ON r.id = hit.rowid
+        ORDER BY hit.score, hit.rowid;
+        """,
+        """
+        SELECT req_id, title,
+               substr(replace(description, char(10), ' '), 1, 200),
+               status, priority
         FROM requirement
-        WHERE LOWER(title) LIKE LOWER(?)
-           OR LOWER(description) LIKE LOWER(?)
-        ORDER BY req_id;
-    """
-    cur.execute(sql, (pattern, pattern))
-    return cur.fetchall()
-
-
-def _search_decisions(
-    cur: sqlite3_types.Cursor, query: str, fts_enabled: bool
-) -> List[Tuple[str, str, str, str, str, float]]:
-    """Search decisions using FTS5 or LIKE fallback."""
-    if fts_enabled:
-        prepared_query = _prepare_fts_query(query)
-        sql = """
-            SELECT d.scope_type, d.scope_ref, d.question, d.choice, d.rationale, d.confidence
-            FROM decision_fts
-            JOIN decision d ON d.id = decision_fts.rowid
-            WHERE decision_fts MATCH ?;
+        WHERE {where}
+        ORDER BY req_id
+        LIMIT ?;
+        """,
+        ("title", "description"),
+    ),
+    "decision": (
+        f"""
+        SELECT d.scope_type, d.scope_ref, d.question, d.choice,
+               substr(d.rationale, 1, 150), d.confidence
+        FROM (
+          SELECT rowid, {_RANK_DECISION} AS score FROM decision_fts
+          WHERE decision_fts MATCH ?
+          ORDER BY score LIMIT ?
+        ) AS hit
+        JOIN decision d ON d.id = hit.rowid
+        ORDER BY hit.score, hit.rowid;
+        """,
         """
-        cur.execute(sql, (prepared_query,))
-        rows = cur.fetchall()
-        if rows:
-            return rows
-
-    pattern = _like_pattern(query)
-    sql = """
-        SELECT scope_type, scope_ref, question, choice, rationale, confidence
+        SELECT scope_type, scope_ref, question, choice,
+               substr(rationale, 1, 150), confidence
         FROM decision
-        WHERE LOWER(question) LIKE LOWER(?)
-           OR LOWER(choice) LIKE LOWER(?)
-           OR LOWER(rationale) LIKE LOWER(?)
-        ORDER BY created_at DESC;
-    """
-    cur.execute(sql, (pattern, pattern, pattern))
-    return cur.fetchall()
-
-
-def _search_questions(
-    cur: sqlite3_types.Cursor, query: str, fts_enabled: bool
-) -> List[Tuple[str, str, str, str]]:
-    """Search open questions using FTS5 or LIKE fallback."""
-    if fts_enabled:
-        prepared_query = _prepare_fts_query(query)
-        sql = """
-            SELECT q.scope_type, q.scope_ref, q.question, q.severity
-            FROM open_question_fts
-            JOIN open_question q ON q.id = open_question_fts.rowid
-            WHERE open_question_fts MATCH ?;
+        WHERE {where}
+        ORDER BY created_at DESC
+        LIMIT ?;
+        """,
+        ("question", "choice", "rationale"),
+    ),
+    "question": (
+        f"""
+        SELECT q.scope_type, q.scope_ref, q.question, q.severity
+        FROM (
+          SELECT rowid, {_RANK_OPEN_QUESTION} AS score FROM open_question_fts
+          WHERE open_question_fts MATCH ?
+          ORDER BY score LIMIT ?
+        ) AS hit
+        JOIN open_question q ON q.id = hit.rowid
+        ORDER BY hit.score, hit.rowid;
+        """,
         """
-        cur.execute(sql, (prepared_query,))
-        rows = cur.fetchall()
-        if rows:
-            return rows
-
-    pattern = _like_pattern(query)
-    sql = """
         SELECT scope_type, scope_ref, question, severity
         FROM open_question
-        WHERE LOWER(question) LIKE LOWER(?)
-        ORDER BY created_at DESC;
+        WHERE {where}
+        ORDER BY created_at DESC
+        LIMIT ?;
+        """,
+        ("question",),
+    ),
+}
+
+
+def _search(
+    cur: sqlite3_types.Cursor,
+    scope: str,
+    query: str,
+    use_fts: bool,
+    prefix: bool = True,
+    limit: int = DEFAULT_LIMIT,
+    like_fallback: bool = False,
+) -> List[Tuple]:
+    """Search one scope with FTS5 when `use_fts` is set, otherwise with LIKE.
+
+    With `like_fallback`, an FTS search that finds nothing is retried with
+    LIKE. At most `limit` rows are returned; a negative limit means no limit.
     """
-    cur.execute(sql, (pattern,))
-    return cur.fetchall()
+    fts_sql, like_sql, like_columns = SCOPES[scope]
+    if use_fts:
+        rows = cur.execute(
+            fts_sql, (_prepare_fts_query(query, prefix), limit)
+        ).fetchall()
+        if rows or not like_fallback:
+            return rows
+
+    terms = _like_terms(query)
+    if not terms:
+        # An empty query matches everything, as `LIKE '%'` always did
+        return cur.execute(like_sql.format(where="1"), (limit,)).fetchall()
+    # One parenthesized OR group per term, ANDed together
+    term_sql = (
+        "(" + " OR ".join(f"{col} LIKE ? ESCAPE '\\'" for col in like_columns) + ")"
+    )
+    params = [pattern for pattern in terms for _ in like_columns]
+    return cur.execute(
+        like_sql.format(where=" AND ".join([term_sql] * len(terms))),
+        (*params, limit),
+    ).fetchall()
 
 
 def main() -> None:
@@ -140,7 +221,7 @@ def main() -> None:
     )
     parser.add_argument(
         "--scope",
-        choices=["requirement", "decision", "question", "all"],
+        choices=[*SCOPES, "all"],
         default="all",
         help="Scope to search (default: all)",
     )
@@ -150,7 +231,15 @@ def main() -> None:
         default="auto",
         help="Search backend: auto-detect, force FTS5, or force LIKE fallback",
     )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_LIMIT,
+        help=f"Max results per scope, best FTS matches first (default: {DEFAULT_LIMIT}; 0 = no limit)",
+    )
     args = parser.parse_args()
+    if args.limit < 0:
+        parser.error("--limit must be >= 0")
 
     env_mode = (os.getenv("IDEATE_PM_SEARCH_MODE") or "").strip().lower()
     mode = args.mode
@@ -165,14 +254,17 @@ def main() -> None:
                 f"falling back to CLI mode '{mode}'."
             )
 
-    skill_root = Path(__file__).resolve().parents[1]
-    db_path = skill_root / "product" / "memory.sqlite"
-    if not db_path.exists():
+    if not _DB_PATH.exists():
         raise SystemExit(
             'Repo product is not initialized. Run: python scripts/init_product.py --title "..."'
         )
 
-    conn = runtime_sqlite.connect(db_path)
+    # Probed here rather than at import so --help and importers skip it
+    sqlite_env = load_sqlite_with_fts()
+    # Not mode=ro: only a read-write connection can checkpoint and remove the
+    # -wal/-shm files when it is the last one to close
+    conn = sqlite_env.sqlite.connect(_DB_PATH)
+    sqlite_env.tune_reader(conn)
     cur = conn.cursor()
 
     fts_available = sqlite_env.has_fts5
@@ -198,27 +290,36 @@ def main() -> None:
 
     query = args.query
     scope = args.scope
-    results_found = False
+    # Trigram indexes match any substring, so the backend is picked once and
+    # FTS and LIKE never both run. unicode61 indexes miss CJK and mid-word
+    # text, so an empty FTS result there still falls back to LIKE.
+    trigram = fts_enabled and _uses_trigram(cur)
+    use_fts = fts_enabled and (not trigram or _trigram_can_match(query))
+    like_fallback = use_fts and not trigram
+    prefix = not trigram
+    # SQLite treats a negative LIMIT as unlimited
+    limit = args.limit or -1
+    # Lines are collected and written once instead of one print() per row
+    out: List[str] = []
 
     if scope in ("requirement", "all"):
-        results = _search_requirements(cur, query, fts_enabled)
+        results = _search(
+            cur, "requirement", query, use_fts, prefix, limit, like_fallback
+        )
         if results:
-            results_found = True
-            print("## Requirements")
-            print()
-            for req_id, title, desc, status, priority in results:
-                print(f"**{req_id}** [{status}] {title}")
-                if desc:
-                    desc_snippet = desc.replace("\n", " ")[:200]
-                    print(f"   {desc_snippet}...")
-                print()
+            out += ["## Requirements", ""]
+            for req_id, title, desc_snippet, status, priority in results:
+                out.append(f"**{req_id}** [{status}] {title}")
+                if desc_snippet:
+                    out.append(f"   {desc_snippet}...")
+                out.append("")
 
     if scope in ("decision", "all"):
-        results = _search_decisions(cur, query, fts_enabled)
+        results = _search(
+            cur, "decision", query, use_fts, prefix, limit, like_fallback
+        )
         if results:
-            results_found = True
-            print("## Decisions")
-            print()
+            out += ["## Decisions", ""]
             for (
                 scope_type,
                 scope_ref,
@@ -228,27 +329,27 @@ def main() -> None:
                 confidence,
             ) in results:
                 scope_str = scope_type if not scope_ref else f"{scope_type}:{scope_ref}"
-                print(f"**[{scope_str}]** Q: {question}")
-                print(f"   → Choice: {choice}")
+                out.append(f"**[{scope_str}]** Q: {question}")
+                out.append(f"   → Choice: {choice}")
                 if rationale:
-                    print(f"   → Rationale: {rationale[:150]}...")
-                print()
+                    out.append(f"   → Rationale: {rationale}...")
+                out.append("")
 
     if scope in ("question", "all"):
-        results = _search_questions(cur, query, fts_enabled)
+        results = _search(
+            cur, "question", query, use_fts, prefix, limit, like_fallback
+        )
         if results:
-            results_found = True
-            print("## Open Questions")
-            print()
+            out += ["## Open Questions", ""]
             for scope_type, scope_ref, question, severity in results:
                 scope_str = scope_type if not scope_ref else f"{scope_type}:{scope_ref}"
-                print(f"**[{scope_str}]** [{severity}] {question}")
-                print()
+                out += [f"**[{scope_str}]** [{severity}] {question}", ""]
 
-    if not results_found:
-        print(f"No results found for query: {query}")
+    if not out:
+        out.append(f"No results found for query: {query}")
 
     conn.close()
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
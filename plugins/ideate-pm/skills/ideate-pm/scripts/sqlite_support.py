@@ -11,70 +11,217 @@ callers can keep the feature usable, albeit with reduced ranking quality.
 from __future__ import annotations
 
 import importlib
-from dataclasses import dataclass
+import sqlite3 as _stdlib_sqlite
+import sys
+from contextlib import closing
 from functools import lru_cache
-from typing import Any, Iterable, Protocol
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Tuple
 
 
-class SQLiteModule(Protocol):
-    def connect(self, *args: Any, **kwargs: Any) -> Any: ...
+if TYPE_CHECKING:
+    from typing import Protocol
 
+    class SQLiteModule(Protocol):
+        def connect(self, *args: Any, **kwargs: Any) -> Any: ...
 
+else:
+    # Only type checkers need the Protocol; skip building it at runtime
+    SQLiteModule = Any
+
+
+def _cached_import(name: str) -> Any:
+    """Return an already-imported module from sys.modules, else import it."""
+    module = sys.modules.get(name)
+    return module if module is not None else importlib.import_module(name)
+
+
+# The compile options are authoritative for a linked-in fts5 module; the
+# table-valued pragma (SQLite 3.16+) filters them in C
+_FTS5_PROBE_SQL = (
+    "SELECT 1 FROM pragma_compile_options "
+    "WHERE compile_options = 'ENABLE_FTS5' LIMIT 1;"
+)
+
+_BUNDLED_FTS5_MODULES = frozenset({"pysqlite3", "pysqlite3.dbapi2"})
+
+
+# Module objects are hashable, so each candidate module is probed only once
+@lru_cache(maxsize=4)
 def _has_fts5(sqlite_mod: SQLiteModule) -> bool:
     """Return True if the sqlite module advertises FTS5 support."""
+    # requirements.txt installs pysqlite3 as the pysqlite3-binary wheel, whose
+    # bundled SQLite is always built with FTS5
+    if getattr(sqlite_mod, "__name__", "") in _BUNDLED_FTS5_MODULES:
+        return True
+    # FTS5 shipped in SQLite 3.9 and pragma_compile_options in 3.16; older
+    # libraries are rejected without opening a connection
+    if getattr(sqlite_mod, "sqlite_version_info", (0,)) < (3, 16, 0):
+        return False
     try:
-        conn = sqlite_mod.connect(":memory:")
-        try:
-            rows = conn.execute("PRAGMA compile_options;").fetchall()
-            if any(
-                "FTS5" in (row[0] if isinstance(row, Iterable) else "") for row in rows
-            ):
-                return True
-            # Fallback: attempt to create a throwaway FTS5 table to confirm support
-            conn.execute("CREATE VIRTUAL TABLE temp_fts_probe USING fts5(x);")
-            conn.execute("DROP TABLE temp_fts_probe;")
-            return True
-        finally:
-            conn.close()
+        # Autocommit with no statement cache: the probe runs one SELECT and
+        # needs neither a transaction nor a cached prepared statement
+        with closing(
+            sqlite_mod.connect(":memory:", isolation_level=None, cached_statements=0)
+        ) as conn:
+            return conn.execute(_FTS5_PROBE_SQL).fetchone() is not None
     except Exception:
         return False
 
 
-@dataclass(frozen=True)
-class SQLiteSupport:
+# Connection settings for the single-user, repo-scoped product database:
+# WAL keeps readers unblocked while a script writes, and synchronous=NORMAL
+# is durable in WAL mode while skipping the fsync on every commit. The busy
+# timeout is left to sqlite3.connect(), whose 5 s default already sets it.
+_TUNING_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-20000;
+PRAGMA mmap_size=67108864;
+"""
+
+# Read-only scripts map up to 256 MB of the database and keep an 8 MB page
+# cache, so repeated lookups are served from the OS page cache without a
+# read() per page.
+_READER_PRAGMAS = """
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-8000;
+"""
+
+
+def _fts_tokenizer(sqlite_mod: SQLiteModule) -> str:
+    """Pick the FTS5 tokenizer for an FTS5-capable SQLite build.
+
+    The trigram tokenizer (SQLite 3.34+) indexes every 3-character substring,
+    so CJK text and mid-word queries match without prefix-star expansion.
+    Older builds keep the default unicode61 tokenizer.
+    """
+    version = getattr(sqlite_mod, "sqlite_version_info", (0,))
+    return "trigram" if version >= (3, 34, 0) else "unicode61"
+
+
+class SQLiteSupport(NamedTuple):
     """Bundle metadata about the loaded SQLite module."""
 
     sqlite: SQLiteModule
     has_fts5: bool
     fuzzy_mode: bool
     source: str
+    # FTS5 `tokenize=` value for new indexes; None when FTS5 is unavailable
+    tokenizer: Optional[str] = None
+
+    # Class attributes, not tuple fields: one PRAGMA batch per connection
+    pragma_sql = _TUNING_PRAGMAS
+    reader_pragma_sql = _READER_PRAGMAS
+
+    def tune(self, conn: Any) -> None:
+        """Apply WAL journaling and write-friendly PRAGMAs to an open connection."""
+        conn.executescript(self.pragma_sql)
+
+    def tune_reader(self, conn: Any) -> None:
+        """Apply read-side PRAGMAs to a connection that only runs SELECTs."""
+        conn.executescript(self.reader_pragma_sql)
+
+    @staticmethod
+    def like_params(query: str) -> Tuple[str, ...]:
+        """Return one `%term%` LIKE pattern per whitespace-separated term.
+
+        `%`, `_` and `\\` are escaped, so the patterns must be bound to
+        `col LIKE ? ESCAPE '\\'` conditions.
+        """
+        escaped = (
+            query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        return tuple(f"%{term}%" for term in escaped.split())
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def bm25_expr(table: str, *weights: float) -> str:
+        """Return the `bm25(table, w1, ...)` ranking expression for an FTS5 table.
+
+        Weights follow the table's column order (lower scores rank higher);
+        the formatted string is cached per (table, weights).
+        """
+        args = ", ".join([table, *(repr(float(w)) for w in weights)])
+        return f"bm25({args})"
+
+
+# Shared results for the stdlib module, so callers (and tests that clear the
+# cache) always get the same object back
+_STDLIB_FTS = SQLiteSupport(
+    sqlite=_stdlib_sqlite,
+    has_fts5=True,
+    fuzzy_mode=False,
+    source="stdlib",
+    tokenizer=_fts_tokenizer(_stdlib_sqlite),
+)
+_STDLIB_NO_FTS = SQLiteSupport(
+    sqlite=_stdlib_sqlite, has_fts5=False, fuzzy_mode=True, source="stdlib-no-fts"
+)
+
+
+# Result of the first load_sqlite_with_fts() call
+_cached_support: Optional[SQLiteSupport] = None
 
 
-@lru_cache(maxsize=1)
 def load_sqlite_with_fts() -> SQLiteSupport:
     """
     Load a sqlite module with FTS5 support if possible.
 
     Returns metadata about the loaded module and whether callers should degrade
-    to fuzzy LIKE queries (when `fuzzy_mode` is True).
+    to fuzzy LIKE queries (when `fuzzy_mode` is True). The result is computed
+    once per process.
     """
-    base_mod = importlib.import_module("sqlite3")
-    if _has_fts5(base_mod):
-        return SQLiteSupport(
-            sqlite=base_mod, has_fts5=True, fuzzy_mode=False, source="stdlib"
-        )
+    global _cached_support
+    support = _cached_support
+    if support is None:
+        support = _cached_support = _compute_sqlite_support()
+    return support
+
+
+def _compute_sqlite_support() -> SQLiteSupport:
+    if _has_fts5(_stdlib_sqlite):
+        return _STDLIB_FTS
 
     # stdlib lacked FTS5; try bundled wheel
     try:
-        bundled = importlib.import_module("pysqlite3")
+        bundled = _cached_import("pysqlite3")
         if _has_fts5(bundled):
             return SQLiteSupport(
-                sqlite=bundled, has_fts5=True, fuzzy_mode=False, source="pysqlite3"
+                sqlite=bundled,
+                has_fts5=True,
+                fuzzy_mode=False,
+                source="pysqlite3",
+                tokenizer=_fts_tokenizer(bundled),
             )
     except ModuleNotFoundError:
         pass
 
     # Fall back to stdlib without FTS5; signal fuzzy mode
-    return SQLiteSupport(
-        sqlite=base_mod, has_fts5=False, fuzzy_mode=True, source="stdlib-no-fts"
-    )
+    return _STDLIB_NO_FTS
+
+
+# Lazily resolved module attributes -> SQLiteSupport field they mirror
+_LAZY_FLAGS = {
+    "HAS_FTS5": "has_fts5",
+    "FUZZY_MODE": "fuzzy_mode",
+    "SQLITE_SOURCE": "source",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve `SQLITE_SUPPORT` and its flag mirrors on first access (PEP 562).
+
+    `from sqlite_support import SQLITE_SUPPORT` (or `HAS_FTS5`, `FUZZY_MODE`,
+    `SQLITE_SOURCE`) gets the probed result as a plain module attribute, while
+    importing this module (e.g., for `--help`) still does not open a probe
+    connection.
+    """
+    if name == "SQLITE_SUPPORT":
+        value: Any = load_sqlite_with_fts()
+    elif name in _LAZY_FLAGS:
+        value = getattr(load_sqlite_with_fts(), _LAZY_FLAGS[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value